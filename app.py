@@ -1,14 +1,59 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
+from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import numpy as np
-import scipy.stats as stats
-from scipy.optimize import minimize_scalar, curve_fit
-from scipy.interpolate import interp1d
 import io
 
+# Horas de calendário de cada período pré-definido
+PERIODOS = {
+    "Dia (24h)": 24,
+    "Semana (168h)": 168,
+    "Mês (720h)": 720,
+    "Ano (8760h)": 8760
+}
+
+# Linhas da tabela de detalhamento do Modo Direto: (métrica, chave em kpis, unidade)
+LINHAS_DETALHAMENTO = {
+    "metodo1": (
+        ('Horas Calendário', 'horas_calendario', ' h'),
+        ('Horas Manutenção Total', 'horas_manutencao_total', ' h'),
+        ('  • Preventiva', 'horas_preventiva', ' h'),
+        ('  • Corretiva', 'horas_corretiva', ' h'),
+        ('Horas Operadas', 'horas_operadas', ' h'),
+        ('Horas Standby', 'horas_standby', ' h'),
+        ('', None, ''),
+        ('DF = (Operadas / Calendário) × 100', 'df', '%')
+    ),
+    "metodo2": (
+        ('Horas Calendário', 'horas_calendario', ' h'),
+        ('Horas Preventiva (programada)', 'horas_preventiva', ' h'),
+        ('Horas Disponíveis (Calendário - Preventiva)', 'horas_disponiveis', ' h'),
+        ('Horas Corretiva (falhas)', 'horas_corretiva', ' h'),
+        ('Horas Operadas', 'horas_operadas', ' h'),
+        ('Horas Standby', 'horas_standby', ' h'),
+        ('', None, ''),
+        ('MTBF (Disponíveis / Falhas)', 'mtbf', ' h'),
+        ('MTTR (Corretiva / Falhas)', 'mttr', ' h'),
+        ('DF = MTBF / (MTBF + MTTR) × 100', 'df', '%')
+    )
+}
+
+# Cores da distribuição de horas: operadas, preventiva, corretiva, standby
+CORES_DISTRIBUICAO_HORAS = ('#2ecc71', '#3498db', '#e74c3c', '#95a5a6')
+
+# Legenda horizontal centralizada abaixo dos gráficos
+LEGENDA_HORIZONTAL = dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
+
+# Conteúdo estático do rodapé
+RODAPE_HTML = """
+<div style='text-align: center; color: #7f8c8d;'>
+    <p>📊 Sistema de Monitoramento de Performance Operacional</p>
+    <p>Desenvolvido para análise de KPIs industriais</p>
+</div>
+"""
+
 # Configuração da página
 st.set_page_config(
     page_title="Monitoramento de Performance Operacional",
@@ -83,46 +128,56 @@ def calcular_kpis(horas_calendario, horas_preventiva, horas_corretiva, num_falha
     
     Método 1: DF Total (inclui preventiva)
     Método 2: DF por MTBF/MTTR (exclui preventiva)
-    """
     
-    # Horas totais de manutenção
+    As fórmulas ficam em calcular_kpis_vetorizado; aqui os resultados
+    são convertidos de volta para escalares.
+    """
+    kpis = calcular_kpis_vetorizado(horas_calendario, horas_preventiva, horas_corretiva, num_falhas, metodo)
+    return {chave: valor.item() for chave, valor in kpis.items()}
+
+def _dividir_seguro(numerador, denominador):
+    """Divisão elemento a elemento que retorna 0 onde o denominador não é positivo"""
+    numerador, denominador = np.broadcast_arrays(
+        np.asarray(numerador, dtype=float),
+        np.asarray(denominador, dtype=float)
+    )
+    return np.divide(numerador, denominador, out=np.zeros(numerador.shape), where=denominador > 0)
+
+# Versão vetorizada de calcular_kpis para séries de períodos
+def calcular_kpis_vetorizado(horas_calendario, horas_preventiva, horas_corretiva, num_falhas, metodo="metodo1"):
+    """
+    Calcula os KPIs operacionais para arrays/Series de uma só vez
+
+    Implementação única das fórmulas (calcular_kpis usa esta função),
+    aplicada coluna a coluna com NumPy. Escalares são expandidos para o
+    tamanho dos arrays recebidos.
+    """
+    horas_calendario, horas_preventiva, horas_corretiva, num_falhas = np.broadcast_arrays(
+        np.asarray(horas_calendario, dtype=float),
+        np.asarray(horas_preventiva, dtype=float),
+        np.asarray(horas_corretiva, dtype=float),
+        np.asarray(num_falhas, dtype=float)
+    )
+
     horas_manutencao_total = horas_preventiva + horas_corretiva
-    
+    mttr = _dividir_seguro(horas_corretiva, num_falhas)
+
     if metodo == "metodo1":
-        # MÉTODO 1: DF Total (inclui preventiva)
-        # Horas operadas considerando TODAS as paradas
+        # MÉTODO 1: DF Total - horas operadas descontam TODAS as paradas
         horas_operadas = horas_calendario - horas_manutencao_total
-        
-        # Disponibilidade Física Total
-        df = (horas_operadas / horas_calendario * 100) if horas_calendario > 0 else 0
-        
-        # MTBF baseado nas horas operadas
-        mtbf = horas_operadas / num_falhas if num_falhas > 0 else 0
-        
+        horas_disponiveis = horas_calendario
+        df = _dividir_seguro(horas_operadas, horas_calendario) * 100
+        mtbf = _dividir_seguro(horas_operadas, num_falhas)
     else:
-        # MÉTODO 2: DF por MTBF/MTTR (exclui preventiva)
-        # Horas disponíveis para operação (exclui apenas preventiva)
+        # MÉTODO 2: DF = MTBF / (MTBF + MTTR), com MTBF sobre as horas disponíveis (sem preventiva)
         horas_disponiveis = horas_calendario - horas_preventiva
-        
-        # Horas efetivamente operadas (disponíveis - corretiva)
         horas_operadas = horas_disponiveis - horas_corretiva
-        
-        # MTBF baseado nas horas disponíveis (sem preventiva)
-        mtbf = horas_disponiveis / num_falhas if num_falhas > 0 else 0
-        
-        # DF calculada pela fórmula clássica: MTBF / (MTBF + MTTR)
-        mttr_temp = horas_corretiva / num_falhas if num_falhas > 0 else 0
-        df = (mtbf / (mtbf + mttr_temp) * 100) if (mtbf + mttr_temp) > 0 else 0
-    
-    # MTTR (igual em ambos os métodos)
-    mttr = horas_corretiva / num_falhas if num_falhas > 0 else 0
-    
-    # Horas standby
-    horas_standby = max(0, horas_calendario - horas_operadas - horas_manutencao_total)
-    
-    # Taxa Preventiva
-    taxa_preventiva = (horas_preventiva / horas_manutencao_total * 100) if horas_manutencao_total > 0 else 0
-    
+        mtbf = _dividir_seguro(horas_disponiveis, num_falhas)
+        df = _dividir_seguro(mtbf, mtbf + mttr) * 100
+
+    horas_standby = np.maximum(0, horas_calendario - horas_operadas - horas_manutencao_total)
+    taxa_preventiva = _dividir_seguro(horas_preventiva, horas_manutencao_total) * 100
+
     return {
         'df': df,
         'mtbf': mtbf,
@@ -134,9 +189,185 @@ def calcular_kpis(horas_calendario, horas_preventiva, horas_corretiva, num_falha
         'horas_corretiva': horas_corretiva,
         'horas_standby': horas_standby,
         'horas_calendario': horas_calendario,
-        'horas_disponiveis': horas_calendario - horas_preventiva if metodo == "metodo2" else horas_calendario
+        'horas_disponiveis': horas_disponiveis
     }
 
+# Simulação de cenários sobre um range de valores
+@st.cache_data(show_spinner=False)
+def simular_cenarios(parametro_variar, valores, horas_calendario, horas_preventiva, num_falhas, mttr, metodo):
+    """
+    Calcula os KPIs para cada valor do parâmetro variado
+
+    O parâmetro indicado em parametro_variar recebe o array 'valores' e os
+    demais permanecem fixos. O resultado fica em cache para as mesmas entradas.
+    """
+    if parametro_variar == "Horas Preventiva":
+        horas_preventiva = valores
+    elif parametro_variar == "Número de Falhas":
+        num_falhas = valores
+    elif parametro_variar == "MTTR":
+        mttr = valores
+    else:  # Horas Calendário
+        horas_calendario = valores
+    
+    kpis_sim = calcular_kpis_vetorizado(
+        horas_calendario,
+        horas_preventiva,
+        num_falhas * mttr,
+        num_falhas,
+        metodo
+    )
+    
+    return pd.DataFrame({
+        'x': valores,
+        'df': kpis_sim['df'],
+        'mtbf': kpis_sim['mtbf'],
+        'mttr': kpis_sim['mttr'],
+        'taxa_preventiva': kpis_sim['taxa_preventiva']
+    })
+
+# Matriz de DF para a escala MTBF x MTTR
+@st.cache_data(show_spinner=False)
+def calcular_matriz_escala(horas_calendario, horas_preventiva, mtbf_range, mttr_range, metodo, pontos=15):
+    """
+    Calcula a DF de cada combinação de MTBF e MTTR dentro dos ranges informados
+
+    Retorna os valores de MTBF (colunas), de MTTR (linhas) e a matriz de DF,
+    calculada por broadcasting e mantida em cache para as mesmas entradas.
+    """
+    mtbf_valores = np.linspace(mtbf_range[0], mtbf_range[1], pontos)
+    mttr_valores = np.linspace(mttr_range[0], mttr_range[1], pontos)
+    
+    mtbf_grid = mtbf_valores[np.newaxis, :]
+    mttr_grid = mttr_valores[:, np.newaxis]
+    
+    if metodo == "metodo2":
+        # Método 2: DF = MTBF / (MTBF + MTTR)
+        df_matrix = (mtbf_grid / (mtbf_grid + mttr_grid)) * 100
+    else:
+        # Método 1: falhas estimadas a partir das horas disponíveis e do MTBF
+        horas_disponiveis = horas_calendario - horas_preventiva
+        num_falhas_est = np.maximum(1, np.trunc(horas_disponiveis / mtbf_grid))
+        
+        df_matrix = calcular_kpis_vetorizado(
+            horas_calendario,
+            horas_preventiva,
+            num_falhas_est * mttr_grid,
+            num_falhas_est,
+            metodo
+        )['df']
+    
+    return mtbf_valores, mttr_valores, df_matrix
+
+# Função para carregar arquivos enviados pelo usuário
+def carregar_arquivo(arquivo):
+    """
+    Lê um arquivo CSV, Excel ou Parquet em um DataFrame
+
+    Parquet já chega com os tipos das colunas preservados, sem a etapa de
+    conversão de texto necessária para CSV/Excel.
+    """
+    return _ler_arquivo(arquivo.getvalue(), arquivo.name)
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=32)
+def _ler_arquivo(conteudo, nome):
+    """Faz o parse do arquivo uma única vez por conteúdo, entre os reruns do Streamlit"""
+    buffer = io.BytesIO(conteudo)
+    if nome.endswith('.csv'):
+        return pd.read_csv(buffer)
+    if nome.endswith('.parquet'):
+        return pd.read_parquet(buffer)
+    return pd.read_excel(buffer)
+
+# Função para reduzir o uso de memória dos dados carregados
+def otimizar_tipos(df):
+    """
+    Ajusta os tipos das colunas de um DataFrame carregado
+
+    Inteiros são rebaixados para o menor tipo que comporta os valores e colunas
+    de texto com poucos valores distintos passam a 'category'. Colunas float
+    permanecem em float64 para não perder precisão nas horas.
+    """
+    for col in df.select_dtypes(include='integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+
+    for col in df.select_dtypes(include=['object', 'string']).columns:
+        if df[col].nunique() < len(df) * 0.5:
+            df[col] = df[col].astype('category')
+
+    return df
+
+# Função para preparar os dados históricos com os KPIs de cada período
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=32)
+def preparar_historico(conteudo, nome, metodo):
+    """
+    Ordena o histórico por data e adiciona os KPIs calculados de cada período
+
+    O resultado fica em cache por conteúdo do arquivo e método, então reruns
+    causados por outros widgets não repetem a conversão nem o cálculo.
+    """
+    df_historico = _ler_arquivo(conteudo, nome)
+    df_historico['data'] = pd.to_datetime(df_historico['data'])
+    df_historico = otimizar_tipos(df_historico.sort_values('data', ignore_index=True))
+
+    kpis_historicos = calcular_kpis_vetorizado(
+        df_historico['horas_calendario'],
+        df_historico['horas_preventiva'],
+        df_historico['horas_corretiva'],
+        df_historico['num_falhas'],
+        metodo
+    )
+
+    df_kpis = pd.DataFrame(kpis_historicos, index=df_historico.index)
+    return pd.concat([df_historico, df_kpis], axis=1)
+
+# Redução de pontos para gráficos de séries longas
+def reduzir_pontos_lttb(x, y, limite=2000):
+    """
+    Seleciona até 'limite' pontos de uma série com Largest-Triangle-Three-Buckets
+
+    Mantém o primeiro e o último ponto e, em cada bucket intermediário, o ponto
+    que forma o maior triângulo com o ponto anterior escolhido e a média do
+    próximo bucket, preservando picos e vales. Retorna os índices mantidos.
+    """
+    n = len(y)
+    if n <= limite or limite < 3:
+        return np.arange(n)
+    
+    # Datas (com ou sem fuso horário) viram instantes em inteiro via pandas
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x = x.astype('int64')
+    x = x.to_numpy(dtype=float)
+    y = np.asarray(y, dtype=float)
+    
+    # limite - 2 buckets entre o primeiro e o último ponto
+    bordas = np.linspace(1, n - 1, limite - 1).astype(int)
+    indices = np.empty(limite, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    anterior = 0
+    for i in range(limite - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        fim_proximo = bordas[i + 2] if i + 2 < len(bordas) else n
+        media_x = x[fim:fim_proximo].mean()
+        media_y = y[fim:fim_proximo].mean()
+        
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+    
+    return indices
+
+# Título centralizado usado nos gráficos
+def titulo_centralizado(texto):
+    """Retorna a configuração de título centralizado do Plotly"""
+    return {'text': texto, 'x': 0.5, 'xanchor': 'center'}
+
 # Função para criar gráfico de gauge
 def criar_gauge(valor, titulo, meta, range_max=100, sufixo='%'):
     """Cria um gráfico de gauge para KPIs"""
@@ -184,52 +415,56 @@ def criar_gauge(valor, titulo, meta, range_max=100, sufixo='%'):
     
     return fig, status
 
+# Hash de DataFrames por conteúdo para as funções em cache que os recebem
+def _hash_dataframe(df):
+    """Hash de todas as linhas (sem amostragem), incluindo índice e nomes das colunas"""
+    return (tuple(df.columns), pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+
 # Funções para Curva Característica
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=32, hash_funcs={pd.DataFrame: _hash_dataframe})
 def calcular_ponto_otimo_intervencao(df_curva, df_alvo=85, custo_preventiva=1000, custo_corretiva=5000):
     """
     Calcula o ponto ótimo para intervenção baseado em DF alvo e custos
     """
     
-    # Calcular DF para cada ponto
-    df_curva['df_calculada'] = (df_curva['mtbf_observado'] / 
-                                 (df_curva['mtbf_observado'] + df_curva['mttr_observado']) * 100)
+    # Calcular DF para cada ponto (sem alterar o DataFrame recebido)
+    df_calculada = (df_curva['mtbf_observado'] / 
+                    (df_curva['mtbf_observado'] + df_curva['mttr_observado']) * 100)
     
     # Encontrar ponto onde DF atinge o alvo
-    df_acima_alvo = df_curva[df_curva['df_calculada'] >= df_alvo]
+    tempos_acima_alvo = df_curva.loc[df_calculada >= df_alvo, 'tempo_desde_preventiva_horas']
     
-    if len(df_acima_alvo) > 0:
-        tempo_max_alvo = df_acima_alvo['tempo_desde_preventiva_horas'].max()
+    if len(tempos_acima_alvo) > 0:
+        tempo_max_alvo = tempos_acima_alvo.max()
     else:
         tempo_max_alvo = 0
     
     # Calcular custo total para diferentes intervalos
-    custos = []
-    for _, row in df_curva.iterrows():
-        tempo = row['tempo_desde_preventiva_horas']
-        num_falhas_acum = df_curva[df_curva['tempo_desde_preventiva_horas'] <= tempo]['num_falhas'].sum()
-        
-        # Custo total = preventiva + corretivas
-        custo_total = custo_preventiva + (num_falhas_acum * custo_corretiva)
-        custo_por_hora = custo_total / tempo if tempo > 0 else 0
-        
-        custos.append({
-            'tempo': tempo,
-            'custo_total': custo_total,
-            'custo_por_hora': custo_por_hora,
-            'df': row['df_calculada']
-        })
-    
-    df_custos = pd.DataFrame(custos)
+    tempo = df_curva['tempo_desde_preventiva_horas']
+
+    # Falhas acumuladas até cada instante: soma por tempo (ordenada) + soma cumulativa
+    falhas_ate_tempo = df_curva.groupby('tempo_desde_preventiva_horas')['num_falhas'].sum().cumsum()
+    num_falhas_acum = tempo.map(falhas_ate_tempo).fillna(0).to_numpy()
+
+    # Custo total = preventiva + corretivas
+    custo_total = custo_preventiva + (num_falhas_acum * custo_corretiva)
+    custo_por_hora = _dividir_seguro(custo_total, tempo)
+
+    df_custos = pd.DataFrame({
+        'tempo': tempo.to_numpy(),
+        'custo_total': custo_total,
+        'custo_por_hora': custo_por_hora,
+        'df': df_calculada.to_numpy()
+    })
     
     # Ponto ótimo: menor custo por hora mantendo DF aceitável
-    df_custos_viavel = df_custos[df_custos['df'] >= df_alvo * 0.95]  # 95% do alvo
+    custo_viavel = df_custos.loc[df_custos['df'] >= df_alvo * 0.95, 'custo_por_hora']  # 95% do alvo
     
-    if len(df_custos_viavel) > 0:
-        idx_otimo = df_custos_viavel['custo_por_hora'].idxmin()
-        ponto_otimo = df_custos_viavel.loc[idx_otimo]
+    if len(custo_viavel) > 0:
+        idx_otimo = custo_viavel.idxmin()
     else:
         idx_otimo = df_custos['custo_por_hora'].idxmin()
-        ponto_otimo = df_custos.loc[idx_otimo]
+    ponto_otimo = df_custos.loc[idx_otimo]
     
     return {
         'tempo_otimo': ponto_otimo['tempo'],
@@ -239,10 +474,15 @@ def calcular_ponto_otimo_intervencao(df_curva, df_alvo=85, custo_preventiva=1000
         'df_custos': df_custos
     }
 
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=32, hash_funcs={pd.DataFrame: _hash_dataframe})
 def ajustar_curva_degradacao(df_curva):
     """
     Ajusta uma curva de degradação aos dados observados
     """
+    # SciPy só é usado aqui; importar sob demanda evita o custo no carregamento do app
+    from scipy.optimize import curve_fit
+    from scipy.interpolate import interp1d
+    
     x = df_curva['tempo_desde_preventiva_horas'].values
     y = df_curva['mtbf_observado'].values
     
@@ -265,48 +505,46 @@ def ajustar_curva_degradacao(df_curva):
         y_fit = f(x_fit)
         return x_fit, y_fit, None
 
+@st.cache_data(show_spinner=False, persist="disk")
 def gerar_template_curva_caracteristica():
     """
     Gera template Excel para download
+
+    O conteúdo é fixo, então o arquivo é montado uma vez e reaproveitado
+    nos reruns seguintes e também após reiniciar o servidor.
     """
-    # Dados de exemplo
+    # Dados de exemplo: 20 semanas após a preventiva, calculadas coluna a coluna
     data_preventiva = datetime(2024, 1, 15)
-    
-    dados_exemplo = []
-    
-    for semana in range(1, 21):
-        data_periodo = data_preventiva + timedelta(weeks=semana)
-        horas_operadas = 160
-        
-        # MTBF degrada ao longo do tempo
-        mtbf_inicial = 200
-        mtbf_minimo = 40
-        mtbf = mtbf_minimo + (mtbf_inicial - mtbf_minimo) * (0.95 ** semana)
-        
-        num_falhas = max(1, int(horas_operadas / mtbf))
-        mttr_base = 4
-        mttr = mttr_base + (semana * 0.15)
-        horas_corretiva = num_falhas * mttr
-        tempo_desde_preventiva = semana * 168
-        
-        dados_exemplo.append({
-            'data_periodo': data_periodo.strftime('%Y-%m-%d'),
-            'semana_apos_preventiva': semana,
-            'tempo_desde_preventiva_horas': tempo_desde_preventiva,
-            'horas_operadas': round(horas_operadas, 2),
-            'num_falhas': num_falhas,
-            'horas_corretiva': round(horas_corretiva, 2),
-            'mtbf_observado': round(mtbf, 2),
-            'mttr_observado': round(mttr, 2),
-            'observacoes': ''
-        })
-    
-    dados_exemplo[0]['observacoes'] = 'Logo após preventiva - equipamento em condição ótima'
-    dados_exemplo[9]['observacoes'] = 'Início da degradação acelerada'
-    dados_exemplo[14]['observacoes'] = 'Ponto crítico - considerar intervenção'
-    dados_exemplo[19]['observacoes'] = 'Degradação severa - intervenção urgente'
-    
-    df_exemplo = pd.DataFrame(dados_exemplo)
+    semanas = np.arange(1, 21)
+    horas_operadas = 160
+    
+    # MTBF degrada ao longo do tempo
+    mtbf_inicial = 200
+    mtbf_minimo = 40
+    mtbf = mtbf_minimo + (mtbf_inicial - mtbf_minimo) * (0.95 ** semanas)
+    
+    num_falhas = np.maximum(1, (horas_operadas / mtbf).astype(int))
+    mttr_base = 4
+    mttr = mttr_base + (semanas * 0.15)
+    horas_corretiva = num_falhas * mttr
+    
+    observacoes = np.full(len(semanas), '', dtype=object)
+    observacoes[0] = 'Logo após preventiva - equipamento em condição ótima'
+    observacoes[9] = 'Início da degradação acelerada'
+    observacoes[14] = 'Ponto crítico - considerar intervenção'
+    observacoes[19] = 'Degradação severa - intervenção urgente'
+    
+    df_exemplo = pd.DataFrame({
+        'data_periodo': (pd.Timestamp(data_preventiva) + pd.to_timedelta(semanas * 7, unit='D')).strftime('%Y-%m-%d'),
+        'semana_apos_preventiva': semanas,
+        'tempo_desde_preventiva_horas': semanas * 168,
+        'horas_operadas': horas_operadas,
+        'num_falhas': num_falhas,
+        'horas_corretiva': np.round(horas_corretiva, 2),
+        'mtbf_observado': np.round(mtbf, 2),
+        'mttr_observado': np.round(mttr, 2),
+        'observacoes': observacoes
+    })
     
     # Criar arquivo Excel em memória
     output = io.BytesIO()
@@ -356,12 +594,189 @@ def gerar_template_curva_caracteristica():
         })
         instrucoes.to_excel(writer, sheet_name='Instrucoes', index=False, header=False)
     
-    output.seek(0)
-    return output
+    return output.getvalue()
 
 # Determinar método de cálculo
 metodo_atual = "metodo1" if "Método 1" in metodo_df else "metodo2"
 
+# Modos interativos em fragmentos: mexer nos seus widgets reexecuta apenas o fragmento
+@st.fragment
+def exibir_simulacao(metodo):
+    """Página de Simulação e Cenários"""
+    st.header("🎲 Simulação e Cenários")
+    
+    st.info("🔬 Varie um parâmetro e veja como os KPIs são afetados.")
+    
+    # Parâmetro a variar
+    parametro_variar = st.selectbox(
+        "Variar parâmetro:",
+        ["Horas Preventiva", "Número de Falhas", "MTTR", "Horas Calendário"]
+    )
+    
+    col1, col2 = st.columns(2)
+    
+    # O parâmetro variado não tem valor fixo
+    horas_calendario_sim = horas_preventiva_sim = num_falhas_sim = mttr_sim = None
+    
+    with col1:
+        st.subheader("Parâmetros Fixos")
+        
+        if parametro_variar != "Horas Calendário":
+            horas_calendario_sim = st.number_input("Horas Calendário:", value=720.0, step=1.0, key="cal_sim")
+        
+        if parametro_variar != "Horas Preventiva":
+            horas_preventiva_sim = st.number_input("Horas Preventiva:", value=40.0, step=1.0, key="prev_sim")
+        
+        if parametro_variar != "Número de Falhas":
+            num_falhas_sim = st.number_input("Número de Falhas:", value=5, step=1, key="falhas_sim")
+        
+        if parametro_variar != "MTTR":
+            mttr_sim = st.number_input("MTTR (h):", value=6.0, step=0.5, key="mttr_sim")
+    
+    with col2:
+        st.subheader("Range de Variação")
+        
+        if parametro_variar == "Horas Preventiva":
+            min_val = st.number_input("Mínimo:", value=10.0, step=1.0)
+            max_val = st.number_input("Máximo:", value=100.0, step=1.0)
+            valores = np.linspace(min_val, max_val, 20)
+        elif parametro_variar == "Número de Falhas":
+            min_val = st.number_input("Mínimo:", value=1, step=1)
+            max_val = st.number_input("Máximo:", value=20, step=1)
+            valores = np.arange(min_val, max_val + 1)
+        elif parametro_variar == "MTTR":
+            min_val = st.number_input("Mínimo:", value=1.0, step=0.5)
+            max_val = st.number_input("Máximo:", value=20.0, step=0.5)
+            valores = np.linspace(min_val, max_val, 20)
+        else:  # Horas Calendário
+            min_val = st.number_input("Mínimo:", value=168.0, step=1.0)
+            max_val = st.number_input("Máximo:", value=8760.0, step=1.0)
+            valores = np.linspace(min_val, max_val, 20)
+    
+    # Realizar simulação
+    df_sim = simular_cenarios(
+        parametro_variar,
+        valores,
+        horas_calendario_sim,
+        horas_preventiva_sim,
+        num_falhas_sim,
+        mttr_sim,
+        metodo
+    )
+    
+    # Gráficos de simulação
+    st.markdown("---")
+    st.subheader("📈 Resultados da Simulação")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig_sim_df = go.Figure()
+        fig_sim_df.add_trace(go.Scattergl(
+            x=df_sim['x'],
+            y=df_sim['df'],
+            mode='lines+markers',
+            name='DF',
+            line=dict(color='#3498db', width=3),
+            marker=dict(size=8)
+        ))
+        
+        fig_sim_df.update_layout(
+            title=titulo_centralizado(f'DF vs {parametro_variar}'),
+            xaxis_title=parametro_variar,
+            yaxis_title='Disponibilidade Física (%)',
+            height=400,
+            hovermode='x unified',
+            uirevision=parametro_variar
+        )
+        
+        st.plotly_chart(fig_sim_df, width="stretch")
+    
+    with col2:
+        fig_sim_mtbf = go.Figure()
+        fig_sim_mtbf.add_trace(go.Scattergl(
+            x=df_sim['x'],
+            y=df_sim['mtbf'],
+            mode='lines+markers',
+            name='MTBF',
+            line=dict(color='#2ecc71', width=3),
+            marker=dict(size=8)
+        ))
+        
+        fig_sim_mtbf.update_layout(
+            title=titulo_centralizado(f'MTBF vs {parametro_variar}'),
+            xaxis_title=parametro_variar,
+            yaxis_title='MTBF (horas)',
+            height=400,
+            hovermode='x unified',
+            uirevision=parametro_variar
+        )
+        
+        st.plotly_chart(fig_sim_mtbf, width="stretch")
+    
+    # Tabela de resultados
+    st.markdown("---")
+    st.subheader("📋 Tabela de Resultados")
+    st.dataframe(df_sim.round(2), width="stretch", hide_index=True)
+
+@st.fragment
+def exibir_escala(metodo):
+    """Página da Escala MTBF/MTTR vs DF"""
+    st.header("📈 Escala MTBF/MTTR vs DF")
+    
+    st.info("📊 Visualize como diferentes combinações de MTBF e MTTR afetam a Disponibilidade Física.")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        horas_calendario_escala = st.number_input("Horas Calendário:", value=720.0, step=1.0, key="cal_escala")
+        horas_preventiva_escala = st.number_input("Horas Preventiva:", value=40.0, step=1.0, key="prev_escala")
+    
+    with col2:
+        mtbf_range = st.slider("Range de MTBF (horas):", 10, 500, (50, 300), key="mtbf_range")
+        mttr_range = st.slider("Range de MTTR (horas):", 1, 50, (2, 20), key="mttr_range")
+    
+    # Grid de DF para cada combinação (linhas = MTTR, colunas = MTBF), em cache por entradas
+    mtbf_valores, mttr_valores, df_matrix = calcular_matriz_escala(
+        horas_calendario_escala,
+        horas_preventiva_escala,
+        mtbf_range,
+        mttr_range,
+        metodo
+    )
+    
+    # Criar heatmap
+    fig_heatmap = go.Figure(data=go.Heatmap(
+        z=df_matrix,
+        x=mtbf_valores,
+        y=mttr_valores,
+        colorscale='RdYlGn',
+        colorbar=dict(title="DF (%)"),
+        hovertemplate='MTBF: %{x:.1f}h<br>MTTR: %{y:.1f}h<br>DF: %{z:.2f}%<extra></extra>'
+    ))
+    
+    fig_heatmap.update_layout(
+        title=titulo_centralizado('Mapa de Calor: MTBF vs MTTR → DF'),
+        xaxis_title='MTBF (horas)',
+        yaxis_title='MTTR (horas)',
+        height=600,
+        uirevision='escala'
+    )
+    
+    st.plotly_chart(fig_heatmap, width="stretch")
+    
+    st.markdown("""
+    **Interpretação:**
+    - 🟢 **Verde**: Alta disponibilidade física (DF > 80%)
+    - 🟡 **Amarelo**: Disponibilidade moderada (DF 60-80%)
+    - 🔴 **Vermelho**: Baixa disponibilidade (DF < 60%)
+    
+    **Insights:**
+    - Aumentar MTBF (mover para direita) melhora a DF
+    - Reduzir MTTR (mover para baixo) melhora a DF
+    - Melhor região: canto inferior direito (alto MTBF, baixo MTTR)
+    """)
+
 # MODO 1: Modo Direto (Calcular KPIs)
 if "Modo Direto" in modo_calculo:
     st.header("📊 Dados de Entrada")
@@ -385,44 +800,20 @@ if "Modo Direto" in modo_calculo:
         - Considera apenas falhas não programadas
         """)
     
+    # Período fica fora do formulário para que o campo personalizado apareça apenas quando selecionado
+    st.subheader("📅 Período de Análise")
     col1, col2 = st.columns(2)
     
     with col1:
-        st.subheader("📋 Metas de Referência")
-        meta_df = st.number_input(
-            "Meta de DF (%):",
-            min_value=0.0,
-            max_value=100.0,
-            value=85.0,
-            step=0.1,
-            help="Meta de Disponibilidade Física"
-        )
-        
-        meta_preventiva = st.number_input(
-            "Meta Taxa Preventiva (%):",
-            min_value=0.0,
-            max_value=100.0,
-            value=35.0,
-            step=0.1,
-            help="Meta de Taxa de Manutenção Preventiva"
-        )
-    
-    with col2:
-        st.subheader("📅 Período de Análise")
         periodo = st.selectbox(
             "Selecione o período:",
-            ["Dia (24h)", "Semana (168h)", "Mês (720h)", "Ano (8760h)", "Personalizado"],
+            [*PERIODOS, "Personalizado"],
             index=2
         )
-        
-        if periodo == "Dia (24h)":
-            horas_calendario = 24
-        elif periodo == "Semana (168h)":
-            horas_calendario = 168
-        elif periodo == "Mês (720h)":
-            horas_calendario = 720
-        elif periodo == "Ano (8760h)":
-            horas_calendario = 8760
+    
+    with col2:
+        if periodo in PERIODOS:
+            horas_calendario = PERIODOS[periodo]
         else:
             horas_calendario = st.number_input(
                 "Horas no Calendário:",
@@ -431,38 +822,65 @@ if "Modo Direto" in modo_calculo:
                 step=1.0
             )
     
-    st.markdown("---")
-    st.subheader("🔧 Dados de Manutenção")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        horas_preventiva = st.number_input(
-            "Horas de Manutenção Preventiva:",
-            min_value=0.0,
-            value=40.0,
-            step=1.0,
-            help="Total de horas em manutenção preventiva programada"
-        )
-    
-    with col2:
-        num_falhas = st.number_input(
-            "Número de Falhas/Quebras:",
-            min_value=0,
-            value=5,
-            step=1,
-            help="Quantidade de falhas ou quebras não programadas no período"
+    # Entradas agrupadas em formulário: os KPIs são recalculados apenas ao clicar em Calcular
+    with st.form("direto_form"):
+        st.subheader("📋 Metas de Referência")
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            meta_df = st.number_input(
+                "Meta de DF (%):",
+                min_value=0.0,
+                max_value=100.0,
+                value=85.0,
+                step=0.1,
+                help="Meta de Disponibilidade Física"
+            )
+        
+        with col2:
+            meta_preventiva = st.number_input(
+                "Meta Taxa Preventiva (%):",
+                min_value=0.0,
+                max_value=100.0,
+                value=35.0,
+                step=0.1,
+                help="Meta de Taxa de Manutenção Preventiva"
+            )
+        
+        st.markdown("---")
+        st.subheader("🔧 Dados de Manutenção")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            horas_preventiva = st.number_input(
+                "Horas de Manutenção Preventiva:",
+                min_value=0.0,
+                value=40.0,
+                step=1.0,
+                help="Total de horas em manutenção preventiva programada"
+            )
+        
+        with col2:
+            num_falhas = st.number_input(
+                "Número de Falhas/Quebras:",
+                min_value=0,
+                value=5,
+                step=1,
+                help="Quantidade de falhas ou quebras não programadas no período"
+            )
+        
+        # Calcular horas corretivas baseado em MTTR estimado
+        mttr_estimado = st.slider(
+            "MTTR Estimado (horas por falha):",
+            min_value=0.5,
+            max_value=20.0,
+            value=6.0,
+            step=0.5,
+            help="Tempo médio para reparo por falha"
         )
-    
-    # Calcular horas corretivas baseado em MTTR estimado
-    mttr_estimado = st.slider(
-        "MTTR Estimado (horas por falha):",
-        min_value=0.5,
-        max_value=20.0,
-        value=6.0,
-        step=0.5,
-        help="Tempo médio para reparo por falha"
-    )
+        
+        st.form_submit_button("Calcular", type="primary")
     
     horas_corretiva = num_falhas * mttr_estimado
     
@@ -535,58 +953,15 @@ if "Modo Direto" in modo_calculo:
     st.markdown("---")
     st.subheader("📊 Detalhamento:")
     
-    if metodo_atual == "metodo2":
-        detalhamento_df = pd.DataFrame({
-            'Métrica': [
-                'Horas Calendário',
-                'Horas Preventiva (programada)',
-                'Horas Disponíveis (Calendário - Preventiva)',
-                'Horas Corretiva (falhas)',
-                'Horas Operadas',
-                'Horas Standby',
-                '',
-                'MTBF (Disponíveis / Falhas)',
-                'MTTR (Corretiva / Falhas)',
-                'DF = MTBF / (MTBF + MTTR) × 100'
-            ],
-            'Valor': [
-                f"{kpis['horas_calendario']:.2f} h",
-                f"{kpis['horas_preventiva']:.2f} h",
-                f"{kpis['horas_disponiveis']:.2f} h",
-                f"{kpis['horas_corretiva']:.2f} h",
-                f"{kpis['horas_operadas']:.2f} h",
-                f"{kpis['horas_standby']:.2f} h",
-                "",
-                f"{kpis['mtbf']:.2f} h",
-                f"{kpis['mttr']:.2f} h",
-                f"{kpis['df']:.2f}%"
-            ]
-        })
-    else:
-        detalhamento_df = pd.DataFrame({
-            'Métrica': [
-                'Horas Calendário',
-                'Horas Manutenção Total',
-                '  • Preventiva',
-                '  • Corretiva',
-                'Horas Operadas',
-                'Horas Standby',
-                '',
-                'DF = (Operadas / Calendário) × 100'
-            ],
-            'Valor': [
-                f"{kpis['horas_calendario']:.2f} h",
-                f"{kpis['horas_manutencao_total']:.2f} h",
-                f"{kpis['horas_preventiva']:.2f} h",
-                f"{kpis['horas_corretiva']:.2f} h",
-                f"{kpis['horas_operadas']:.2f} h",
-                f"{kpis['horas_standby']:.2f} h",
-                "",
-                f"{kpis['df']:.2f}%"
-            ]
-        })
+    metricas, chaves, unidades = zip(*LINHAS_DETALHAMENTO[metodo_atual])
     
-    st.dataframe(detalhamento_df, use_container_width=True, hide_index=True)
+    # Formatação em uma única passada; linhas separadoras (sem chave) ficam vazias
+    valores = np.array([kpis[chave] if chave else np.nan for chave in chaves], dtype=float)
+    valores_fmt = np.char.add(np.char.mod('%.2f', valores), unidades)
+    valores_fmt[np.isnan(valores)] = ''
+    detalhamento_df = pd.DataFrame({'Métrica': metricas, 'Valor': valores_fmt})
+    
+    st.dataframe(detalhamento_df, width="stretch", hide_index=True)
     
     # Fórmulas
     st.markdown("---")
@@ -613,67 +988,58 @@ if "Modo Direto" in modo_calculo:
         # Gráfico de pizza - Distribuição de horas
         if metodo_atual == "metodo2":
             labels = ['Horas Operadas', 'Manutenção Preventiva (programada)', 'Manutenção Corretiva (falhas)', 'Standby']
-            values = [
-                kpis['horas_operadas'],
-                kpis['horas_preventiva'],
-                kpis['horas_corretiva'],
-                kpis['horas_standby']
-            ]
-            colors = ['#2ecc71', '#3498db', '#e74c3c', '#95a5a6']
         else:
             labels = ['Horas Operadas', 'Manutenção Preventiva', 'Manutenção Corretiva', 'Standby']
-            values = [
-                kpis['horas_operadas'],
-                kpis['horas_preventiva'],
-                kpis['horas_corretiva'],
-                kpis['horas_standby']
-            ]
-            colors = ['#2ecc71', '#3498db', '#e74c3c', '#95a5a6']
+        values = [
+            kpis['horas_operadas'],
+            kpis['horas_preventiva'],
+            kpis['horas_corretiva'],
+            kpis['horas_standby']
+        ]
         
         fig_pizza = go.Figure(data=[go.Pie(
             labels=labels,
             values=values,
             hole=0.3,
-            marker=dict(colors=colors)
+            marker=dict(colors=CORES_DISTRIBUICAO_HORAS)
         )])
         
         fig_pizza.update_layout(
-            title={'text': 'Distribuição de Horas', 'x': 0.5, 'xanchor': 'center'},
+            title=titulo_centralizado('Distribuição de Horas'),
             height=400,
             showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
+            legend=LEGENDA_HORIZONTAL
         )
         
-        st.plotly_chart(fig_pizza, use_container_width=True)
+        st.plotly_chart(fig_pizza, width="stretch")
     
     with col2:
         # Gráfico de barras - Comparação com metas
-        fig_barras = go.Figure()
-        
-        fig_barras.add_trace(go.Bar(
-            name='Atual',
-            x=['DF (%)', 'Taxa Preventiva (%)'],
-            y=[kpis['df'], kpis['taxa_preventiva']],
-            marker_color='#3498db'
-        ))
-        
-        fig_barras.add_trace(go.Bar(
-            name='Meta',
-            x=['DF (%)', 'Taxa Preventiva (%)'],
-            y=[meta_df, meta_preventiva],
-            marker_color='#2ecc71'
-        ))
+        fig_barras = go.Figure(data=[
+            go.Bar(
+                name='Atual',
+                x=['DF (%)', 'Taxa Preventiva (%)'],
+                y=[kpis['df'], kpis['taxa_preventiva']],
+                marker_color='#3498db'
+            ),
+            go.Bar(
+                name='Meta',
+                x=['DF (%)', 'Taxa Preventiva (%)'],
+                y=[meta_df, meta_preventiva],
+                marker_color='#2ecc71'
+            )
+        ])
         
         fig_barras.update_layout(
-            title={'text': 'Comparação com Metas', 'x': 0.5, 'xanchor': 'center'},
+            title=titulo_centralizado('Comparação com Metas'),
             barmode='group',
             height=400,
             yaxis_title='Percentual (%)',
             showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
+            legend=LEGENDA_HORIZONTAL
         )
         
-        st.plotly_chart(fig_barras, use_container_width=True)
+        st.plotly_chart(fig_barras, width="stretch")
     
     # Gauges
     st.markdown("---")
@@ -681,7 +1047,7 @@ if "Modo Direto" in modo_calculo:
     
     with col1:
         fig_gauge_df, status_df = criar_gauge(kpis['df'], 'Disponibilidade Física', meta_df, 100, '%')
-        st.plotly_chart(fig_gauge_df, use_container_width=True)
+        st.plotly_chart(fig_gauge_df, width="stretch")
         st.markdown(f"**Status:** {status_df}")
     
     with col2:
@@ -692,7 +1058,7 @@ if "Modo Direto" in modo_calculo:
             100,
             '%'
         )
-        st.plotly_chart(fig_gauge_prev, use_container_width=True)
+        st.plotly_chart(fig_gauge_prev, width="stretch")
         st.markdown(f"**Status:** {status_prev}")
 
 # MODO 2: Modo Reverso
@@ -740,7 +1106,7 @@ elif "Modo Reverso" in modo_calculo:
     if metodo_atual == "metodo1":
         # Método 1: DF = (Horas Operadas / Horas Calendário) * 100
         # Horas Preventiva = Horas Calendário - (DF/100 * Horas Calendário) - Horas Corretiva
-        horas_preventiva_necessaria = horas_calendario_reverso - (meta_df_reverso/100 * horas_calendario_reverso) - horas_corretiva_reverso
+        horas_preventiva_necessaria = horas_calendario_reverso * (1 - meta_df_reverso/100) - horas_corretiva_reverso
     else:
         # Método 2: DF = MTBF / (MTBF + MTTR) * 100
         # MTBF = (Horas Calendário - Horas Preventiva) / Num Falhas
@@ -749,8 +1115,8 @@ elif "Modo Reverso" in modo_calculo:
             st.error("⚠️ Meta de DF não pode ser 100% com falhas presentes.")
             horas_preventiva_necessaria = -1
         else:
-            mtbf_necessario = (mttr_reverso * meta_df_reverso) / (100 - meta_df_reverso)
-            horas_disponiveis_necessarias = mtbf_necessario * num_falhas_reverso
+            # MTTR * Num Falhas já é a hora corretiva calculada acima
+            horas_disponiveis_necessarias = horas_corretiva_reverso * meta_df_reverso / (100 - meta_df_reverso)
             horas_preventiva_necessaria = horas_calendario_reverso - horas_disponiveis_necessarias
     
     if horas_preventiva_necessaria < 0:
@@ -786,231 +1152,11 @@ elif "Modo Reverso" in modo_calculo:
 
 # MODO 3: Simulação e Cenários
 elif "Simulação e Cenários" in modo_calculo:
-    st.header("🎲 Simulação e Cenários")
-    
-    st.info("🔬 Varie um parâmetro e veja como os KPIs são afetados.")
-    
-    # Parâmetro a variar
-    parametro_variar = st.selectbox(
-        "Variar parâmetro:",
-        ["Horas Preventiva", "Número de Falhas", "MTTR", "Horas Calendário"]
-    )
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Parâmetros Fixos")
-        
-        if parametro_variar != "Horas Calendário":
-            horas_calendario_sim = st.number_input("Horas Calendário:", value=720.0, step=1.0, key="cal_sim")
-        
-        if parametro_variar != "Horas Preventiva":
-            horas_preventiva_sim = st.number_input("Horas Preventiva:", value=40.0, step=1.0, key="prev_sim")
-        
-        if parametro_variar != "Número de Falhas":
-            num_falhas_sim = st.number_input("Número de Falhas:", value=5, step=1, key="falhas_sim")
-        
-        if parametro_variar != "MTTR":
-            mttr_sim = st.number_input("MTTR (h):", value=6.0, step=0.5, key="mttr_sim")
-    
-    with col2:
-        st.subheader("Range de Variação")
-        
-        if parametro_variar == "Horas Preventiva":
-            min_val = st.number_input("Mínimo:", value=10.0, step=1.0)
-            max_val = st.number_input("Máximo:", value=100.0, step=1.0)
-            valores = np.linspace(min_val, max_val, 20)
-        elif parametro_variar == "Número de Falhas":
-            min_val = st.number_input("Mínimo:", value=1, step=1)
-            max_val = st.number_input("Máximo:", value=20, step=1)
-            valores = np.arange(min_val, max_val + 1)
-        elif parametro_variar == "MTTR":
-            min_val = st.number_input("Mínimo:", value=1.0, step=0.5)
-            max_val = st.number_input("Máximo:", value=20.0, step=0.5)
-            valores = np.linspace(min_val, max_val, 20)
-        else:  # Horas Calendário
-            min_val = st.number_input("Mínimo:", value=168.0, step=1.0)
-            max_val = st.number_input("Máximo:", value=8760.0, step=1.0)
-            valores = np.linspace(min_val, max_val, 20)
-    
-    # Realizar simulação
-    resultados_sim = []
-    
-    for valor in valores:
-        if parametro_variar == "Horas Preventiva":
-            kpis_temp = calcular_kpis(
-                horas_calendario_sim,
-                valor,
-                num_falhas_sim * mttr_sim,
-                num_falhas_sim,
-                metodo_atual
-            )
-            x_label = valor
-        elif parametro_variar == "Número de Falhas":
-            kpis_temp = calcular_kpis(
-                horas_calendario_sim,
-                horas_preventiva_sim,
-                valor * mttr_sim,
-                int(valor),
-                metodo_atual
-            )
-            x_label = valor
-        elif parametro_variar == "MTTR":
-            kpis_temp = calcular_kpis(
-                horas_calendario_sim,
-                horas_preventiva_sim,
-                num_falhas_sim * valor,
-                num_falhas_sim,
-                metodo_atual
-            )
-            x_label = valor
-        else:  # Horas Calendário
-            kpis_temp = calcular_kpis(
-                valor,
-                horas_preventiva_sim,
-                num_falhas_sim * mttr_sim,
-                num_falhas_sim,
-                metodo_atual
-            )
-            x_label = valor
-        
-        resultados_sim.append({
-            'x': x_label,
-            'df': kpis_temp['df'],
-            'mtbf': kpis_temp['mtbf'],
-            'mttr': kpis_temp['mttr'],
-            'taxa_preventiva': kpis_temp['taxa_preventiva']
-        })
-    
-    df_sim = pd.DataFrame(resultados_sim)
-    
-    # Gráficos de simulação
-    st.markdown("---")
-    st.subheader("📈 Resultados da Simulação")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        fig_sim_df = go.Figure()
-        fig_sim_df.add_trace(go.Scatter(
-            x=df_sim['x'],
-            y=df_sim['df'],
-            mode='lines+markers',
-            name='DF',
-            line=dict(color='#3498db', width=3),
-            marker=dict(size=8)
-        ))
-        
-        fig_sim_df.update_layout(
-            title={'text': f'DF vs {parametro_variar}', 'x': 0.5, 'xanchor': 'center'},
-            xaxis_title=parametro_variar,
-            yaxis_title='Disponibilidade Física (%)',
-            height=400,
-            hovermode='x unified'
-        )
-        
-        st.plotly_chart(fig_sim_df, use_container_width=True)
-    
-    with col2:
-        fig_sim_mtbf = go.Figure()
-        fig_sim_mtbf.add_trace(go.Scatter(
-            x=df_sim['x'],
-            y=df_sim['mtbf'],
-            mode='lines+markers',
-            name='MTBF',
-            line=dict(color='#2ecc71', width=3),
-            marker=dict(size=8)
-        ))
-        
-        fig_sim_mtbf.update_layout(
-            title={'text': f'MTBF vs {parametro_variar}', 'x': 0.5, 'xanchor': 'center'},
-            xaxis_title=parametro_variar,
-            yaxis_title='MTBF (horas)',
-            height=400,
-            hovermode='x unified'
-        )
-        
-        st.plotly_chart(fig_sim_mtbf, use_container_width=True)
-    
-    # Tabela de resultados
-    st.markdown("---")
-    st.subheader("📋 Tabela de Resultados")
-    st.dataframe(df_sim.round(2), use_container_width=True, hide_index=True)
+    exibir_simulacao(metodo_atual)
 
 # MODO 4: Escala MTBF/MTTR vs DF
 elif "Escala MTBF/MTTR vs DF" in modo_calculo:
-    st.header("📈 Escala MTBF/MTTR vs DF")
-    
-    st.info("📊 Visualize como diferentes combinações de MTBF e MTTR afetam a Disponibilidade Física.")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        horas_calendario_escala = st.number_input("Horas Calendário:", value=720.0, step=1.0, key="cal_escala")
-        horas_preventiva_escala = st.number_input("Horas Preventiva:", value=40.0, step=1.0, key="prev_escala")
-    
-    with col2:
-        mtbf_range = st.slider("Range de MTBF (horas):", 10, 500, (50, 300), key="mtbf_range")
-        mttr_range = st.slider("Range de MTTR (horas):", 1, 50, (2, 20), key="mttr_range")
-    
-    # Criar grid de valores
-    mtbf_valores = np.linspace(mtbf_range[0], mtbf_range[1], 15)
-    mttr_valores = np.linspace(mttr_range[0], mttr_range[1], 15)
-    
-    # Calcular DF para cada combinação
-    df_matrix = np.zeros((len(mttr_valores), len(mtbf_valores)))
-    
-    for i, mttr_val in enumerate(mttr_valores):
-        for j, mtbf_val in enumerate(mtbf_valores):
-            if metodo_atual == "metodo2":
-                # Método 2: DF = MTBF / (MTBF + MTTR)
-                df_matrix[i, j] = (mtbf_val / (mtbf_val + mttr_val)) * 100
-            else:
-                # Método 1: Calcular baseado em horas
-                horas_disponiveis = horas_calendario_escala - horas_preventiva_escala
-                num_falhas_est = max(1, int(horas_disponiveis / mtbf_val))
-                horas_corretiva_est = num_falhas_est * mttr_val
-                
-                kpis_escala = calcular_kpis(
-                    horas_calendario_escala,
-                    horas_preventiva_escala,
-                    horas_corretiva_est,
-                    num_falhas_est,
-                    metodo_atual
-                )
-                
-                df_matrix[i, j] = kpis_escala['df']
-    
-    # Criar heatmap
-    fig_heatmap = go.Figure(data=go.Heatmap(
-        z=df_matrix,
-        x=mtbf_valores,
-        y=mttr_valores,
-        colorscale='RdYlGn',
-        colorbar=dict(title="DF (%)"),
-        hovertemplate='MTBF: %{x:.1f}h<br>MTTR: %{y:.1f}h<br>DF: %{z:.2f}%<extra></extra>'
-    ))
-    
-    fig_heatmap.update_layout(
-        title={'text': 'Mapa de Calor: MTBF vs MTTR → DF', 'x': 0.5, 'xanchor': 'center'},
-        xaxis_title='MTBF (horas)',
-        yaxis_title='MTTR (horas)',
-        height=600
-    )
-    
-    st.plotly_chart(fig_heatmap, use_container_width=True)
-    
-    st.markdown("""
-    **Interpretação:**
-    - 🟢 **Verde**: Alta disponibilidade física (DF > 80%)
-    - 🟡 **Amarelo**: Disponibilidade moderada (DF 60-80%)
-    - 🔴 **Vermelho**: Baixa disponibilidade (DF < 60%)
-    
-    **Insights:**
-    - Aumentar MTBF (mover para direita) melhora a DF
-    - Reduzir MTTR (mover para baixo) melhora a DF
-    - Melhor região: canto inferior direito (alto MTBF, baixo MTTR)
-    """)
+    exibir_escala(metodo_atual)
 
 # MODO 5: Curva Característica de Manutenção
 elif "Curva Característica" in modo_calculo:
@@ -1035,7 +1181,7 @@ elif "Curva Característica" in modo_calculo:
         with col1:
             uploaded_file_curva = st.file_uploader(
                 "Faça upload do arquivo com dados de degradação",
-                type=['xlsx', 'csv'],
+                type=['xlsx', 'csv', 'parquet'],
                 help="Use o template fornecido para coletar os dados"
             )
         
@@ -1076,11 +1222,8 @@ elif "Curva Característica" in modo_calculo:
         if uploaded_file_curva is not None:
             try:
                 # Carregar dados
-                if uploaded_file_curva.name.endswith('.csv'):
-                    df_curva = pd.read_csv(uploaded_file_curva)
-                else:
-                    df_curva = pd.read_excel(uploaded_file_curva)
-                
+                df_curva = otimizar_tipos(carregar_arquivo(uploaded_file_curva))
+
                 st.success("✅ Dados carregados com sucesso!")
                 
                 # Validar colunas
@@ -1105,9 +1248,16 @@ elif "Curva Característica" in modo_calculo:
                     df_curva['df_periodo'] = (df_curva['mtbf_observado'] / 
                                               (df_curva['mtbf_observado'] + df_curva['mttr_observado']) * 100)
                     
+                    # Indicadores do ciclo (usados no resumo e nas recomendações)
+                    mtbf_inicial = df_curva['mtbf_observado'].iloc[0]
+                    mtbf_final = df_curva['mtbf_observado'].iloc[-1]
+                    degradacao_pct = ((mtbf_inicial - mtbf_final) / mtbf_inicial * 100)
+                    df_inicial = df_curva['df_periodo'].iloc[0]
+                    df_final = df_curva['df_periodo'].iloc[-1]
+                    
                     # Preview dos dados
                     st.subheader("📋 Preview dos Dados")
-                    st.dataframe(df_curva.head(10), use_container_width=True)
+                    st.dataframe(df_curva.head(10), width="stretch")
                     
                     st.markdown("---")
                     st.subheader("📊 Análise da Curva de Degradação")
@@ -1145,7 +1295,7 @@ elif "Curva Característica" in modo_calculo:
                     
                     # Calcular ponto ótimo
                     analise_otimo = calcular_ponto_otimo_intervencao(
-                        df_curva.copy(), 
+                        df_curva, 
                         df_alvo, 
                         custo_preventiva, 
                         custo_corretiva
@@ -1160,26 +1310,25 @@ elif "Curva Característica" in modo_calculo:
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        fig_mtbf = go.Figure()
-                        
-                        # Dados observados
-                        fig_mtbf.add_trace(go.Scatter(
-                            x=df_curva['tempo_desde_preventiva_horas'],
-                            y=df_curva['mtbf_observado'],
-                            mode='markers',
-                            name='MTBF Observado',
-                            marker=dict(size=10, color='#3498db'),
-                            hovertemplate='Tempo: %{x}h<br>MTBF: %{y:.2f}h<extra></extra>'
-                        ))
-                        
-                        # Curva ajustada
-                        fig_mtbf.add_trace(go.Scatter(
-                            x=x_fit,
-                            y=y_fit,
-                            mode='lines',
-                            name='Curva de Degradação',
-                            line=dict(color='#e74c3c', width=3, dash='dash')
-                        ))
+                        fig_mtbf = go.Figure(data=[
+                            # Dados observados
+                            go.Scatter(
+                                x=df_curva['tempo_desde_preventiva_horas'],
+                                y=df_curva['mtbf_observado'],
+                                mode='markers',
+                                name='MTBF Observado',
+                                marker=dict(size=10, color='#3498db'),
+                                hovertemplate='Tempo: %{x}h<br>MTBF: %{y:.2f}h<extra></extra>'
+                            ),
+                            # Curva ajustada
+                            go.Scatter(
+                                x=x_fit,
+                                y=y_fit,
+                                mode='lines',
+                                name='Curva de Degradação',
+                                line=dict(color='#e74c3c', width=3, dash='dash')
+                            )
+                        ])
                         
                         # Linha do ponto ótimo
                         fig_mtbf.add_vline(
@@ -1215,7 +1364,7 @@ elif "Curva Característica" in modo_calculo:
                         )
                         
                         fig_mtbf.update_layout(
-                            title={'text': 'Curva de Degradação - MTBF vs Tempo', 'x': 0.5, 'xanchor': 'center'},
+                            title=titulo_centralizado('Curva de Degradação - MTBF vs Tempo'),
                             xaxis_title='Tempo desde Última Preventiva (horas)',
                             yaxis_title='MTBF (horas)',
                             height=500,
@@ -1223,7 +1372,7 @@ elif "Curva Característica" in modo_calculo:
                             showlegend=True
                         )
                         
-                        st.plotly_chart(fig_mtbf, use_container_width=True)
+                        st.plotly_chart(fig_mtbf, width="stretch")
                     
                     with col2:
                         # Gráfico DF vs Tempo
@@ -1257,14 +1406,14 @@ elif "Curva Característica" in modo_calculo:
                         )
                         
                         fig_df.update_layout(
-                            title={'text': 'Evolução da Disponibilidade Física', 'x': 0.5, 'xanchor': 'center'},
+                            title=titulo_centralizado('Evolução da Disponibilidade Física'),
                             xaxis_title='Tempo desde Última Preventiva (horas)',
                             yaxis_title='Disponibilidade Física (%)',
                             height=500,
                             hovermode='x unified'
                         )
                         
-                        st.plotly_chart(fig_df, use_container_width=True)
+                        st.plotly_chart(fig_df, width="stretch")
                     
                     # Gráfico de custos
                     st.markdown("---")
@@ -1297,14 +1446,14 @@ elif "Curva Característica" in modo_calculo:
                     )
                     
                     fig_custos.update_layout(
-                        title={'text': 'Custo por Hora de Operação', 'x': 0.5, 'xanchor': 'center'},
+                        title=titulo_centralizado('Custo por Hora de Operação'),
                         xaxis_title='Tempo desde Última Preventiva (horas)',
                         yaxis_title='Custo por Hora (R$/h)',
                         height=400,
                         hovermode='x unified'
                     )
                     
-                    st.plotly_chart(fig_custos, use_container_width=True)
+                    st.plotly_chart(fig_custos, width="stretch")
                     
                     # Métricas do ponto ótimo
                     st.markdown("---")
@@ -1364,21 +1513,21 @@ elif "Curva Característica" in modo_calculo:
                             'DF Médio'
                         ],
                         'Valor': [
-                            f"{df_curva['mtbf_observado'].iloc[0]:.2f} h",
-                            f"{df_curva['mtbf_observado'].iloc[-1]:.2f} h",
+                            f"{mtbf_inicial:.2f} h",
+                            f"{mtbf_final:.2f} h",
                             f"{df_curva['mtbf_observado'].mean():.2f} h",
-                            f"{df_curva['mtbf_observado'].iloc[0] - df_curva['mtbf_observado'].iloc[-1]:.2f} h",
-                            f"{((df_curva['mtbf_observado'].iloc[0] - df_curva['mtbf_observado'].iloc[-1]) / df_curva['mtbf_observado'].iloc[0] * 100):.1f}%",
+                            f"{mtbf_inicial - mtbf_final:.2f} h",
+                            f"{degradacao_pct:.1f}%",
                             f"{df_curva['mttr_observado'].iloc[0]:.2f} h",
                             f"{df_curva['mttr_observado'].iloc[-1]:.2f} h",
                             f"{df_curva['num_falhas'].sum()}",
-                            f"{df_curva['df_periodo'].iloc[0]:.2f}%",
-                            f"{df_curva['df_periodo'].iloc[-1]:.2f}%",
+                            f"{df_inicial:.2f}%",
+                            f"{df_final:.2f}%",
                             f"{df_curva['df_periodo'].mean():.2f}%"
                         ]
                     })
                     
-                    st.dataframe(resumo_curva, use_container_width=True, hide_index=True)
+                    st.dataframe(resumo_curva, width="stretch", hide_index=True)
             
             except Exception as e:
                 st.error(f"❌ Erro ao processar arquivo: {str(e)}")
@@ -1389,13 +1538,8 @@ elif "Curva Característica" in modo_calculo:
     with tab3:
         st.subheader("💡 Recomendações e Interpretação")
         
-        if uploaded_file_curva is not None and 'df_curva' in locals():
-            # Análise automática e recomendações
-            mtbf_inicial = df_curva['mtbf_observado'].iloc[0]
-            mtbf_final = df_curva['mtbf_observado'].iloc[-1]
-            degradacao_pct = ((mtbf_inicial - mtbf_final) / mtbf_inicial * 100)
-            df_final = df_curva['df_periodo'].iloc[-1]
-            
+        if uploaded_file_curva is not None and 'analise_otimo' in locals():
+            # Análise automática e recomendações (indicadores calculados na aba de análise)
             st.markdown("### 📋 Análise Automática")
             
             # Status geral
@@ -1594,20 +1738,17 @@ elif "Análise Histórica" in modo_calculo:
     st.info("📅 Analise a evolução dos KPIs ao longo do tempo.")
     
     # Opção de upload de arquivo
-    uploaded_file = st.file_uploader("Carregue um arquivo CSV ou Excel com dados históricos", type=['csv', 'xlsx'])
+    uploaded_file = st.file_uploader("Carregue um arquivo CSV, Excel ou Parquet com dados históricos", type=['csv', 'xlsx', 'parquet'])
     
     if uploaded_file is not None:
         try:
-            if uploaded_file.name.endswith('.csv'):
-                df_historico = pd.read_csv(uploaded_file)
-            else:
-                df_historico = pd.read_excel(uploaded_file)
-            
+            df_historico = carregar_arquivo(uploaded_file)
+
             st.success("✅ Arquivo carregado com sucesso!")
             
             # Mostrar preview dos dados
             st.subheader("📋 Preview dos Dados")
-            st.dataframe(df_historico.head(), use_container_width=True)
+            st.dataframe(df_historico.head(), width="stretch")
             
             # Verificar colunas necessárias
             colunas_necessarias = ['data', 'horas_calendario', 'horas_preventiva', 'horas_corretiva', 'num_falhas']
@@ -1617,93 +1758,87 @@ elif "Análise Histórica" in modo_calculo:
                 st.error(f"⚠️ Colunas faltantes: {', '.join(colunas_faltantes)}")
                 st.info("O arquivo deve conter as colunas: data, horas_calendario, horas_preventiva, horas_corretiva, num_falhas")
             else:
-                # Converter data
-                df_historico['data'] = pd.to_datetime(df_historico['data'])
-                
-                # Calcular KPIs para cada linha
-                kpis_historicos = []
-                for _, row in df_historico.iterrows():
-                    kpis_temp = calcular_kpis(
-                        row['horas_calendario'],
-                        row['horas_preventiva'],
-                        row['horas_corretiva'],
-                        row['num_falhas'],
-                        metodo_atual
-                    )
-                    kpis_historicos.append(kpis_temp)
-                
-                df_kpis = pd.DataFrame(kpis_historicos)
-                df_historico = pd.concat([df_historico, df_kpis], axis=1)
+                # Converter data, ordenar e calcular KPIs (em cache por arquivo e método)
+                df_historico = preparar_historico(uploaded_file.getvalue(), uploaded_file.name, metodo_atual)
                 
                 # Gráficos de evolução
                 st.markdown("---")
                 st.subheader("📈 Evolução dos KPIs")
                 
-                col1, col2 = st.columns(2)
+                # Séries longas são reduzidas com LTTB antes de ir para o navegador
+                idx_df = reduzir_pontos_lttb(df_historico['data'], df_historico['df'])
+                idx_mtbf = reduzir_pontos_lttb(df_historico['data'], df_historico['mtbf'])
                 
-                with col1:
-                    fig_evolucao_df = go.Figure()
-                    fig_evolucao_df.add_trace(go.Scatter(
-                        x=df_historico['data'],
-                        y=df_historico['df'],
-                        mode='lines+markers',
-                        name='DF',
-                        line=dict(color='#3498db', width=2),
-                        marker=dict(size=6)
-                    ))
-                    
-                    fig_evolucao_df.update_layout(
-                        title={'text': 'Evolução da Disponibilidade Física', 'x': 0.5, 'xanchor': 'center'},
-                        xaxis_title='Data',
-                        yaxis_title='DF (%)',
-                        height=400,
-                        hovermode='x unified'
-                    )
-                    
-                    st.plotly_chart(fig_evolucao_df, use_container_width=True)
+                # DF e MTBF lado a lado em uma única figura (um só gráfico montado no navegador)
+                fig_evolucao = make_subplots(
+                    rows=1, cols=2,
+                    subplot_titles=('Evolução da Disponibilidade Física', 'Evolução do MTBF')
+                )
                 
-                with col2:
-                    fig_evolucao_mtbf = go.Figure()
-                    fig_evolucao_mtbf.add_trace(go.Scatter(
-                        x=df_historico['data'],
-                        y=df_historico['mtbf'],
-                        mode='lines+markers',
-                        name='MTBF',
-                        line=dict(color='#2ecc71', width=2),
-                        marker=dict(size=6)
-                    ))
-                    
-                    fig_evolucao_mtbf.update_layout(
-                        title={'text': 'Evolução do MTBF', 'x': 0.5, 'xanchor': 'center'},
-                        xaxis_title='Data',
-                        yaxis_title='MTBF (horas)',
-                        height=400,
-                        hovermode='x unified'
-                    )
-                    
-                    st.plotly_chart(fig_evolucao_mtbf, use_container_width=True)
+                fig_evolucao.add_trace(go.Scattergl(
+                    x=df_historico['data'].iloc[idx_df],
+                    y=df_historico['df'].iloc[idx_df],
+                    mode='lines+markers',
+                    name='DF',
+                    line=dict(color='#3498db', width=2),
+                    marker=dict(size=6)
+                ), row=1, col=1)
+                
+                fig_evolucao.add_trace(go.Scattergl(
+                    x=df_historico['data'].iloc[idx_mtbf],
+                    y=df_historico['mtbf'].iloc[idx_mtbf],
+                    mode='lines+markers',
+                    name='MTBF',
+                    line=dict(color='#2ecc71', width=2),
+                    marker=dict(size=6)
+                ), row=1, col=2)
+                
+                fig_evolucao.update_xaxes(title_text='Data')
+                fig_evolucao.update_yaxes(title_text='DF (%)', row=1, col=1)
+                fig_evolucao.update_yaxes(title_text='MTBF (horas)', row=1, col=2)
+                fig_evolucao.update_layout(
+                    height=400,
+                    hovermode='x unified',
+                    showlegend=False
+                )
+                
+                st.plotly_chart(fig_evolucao, width="stretch")
+                
+                if len(idx_df) < len(df_historico):
+                    st.caption(f"📌 Gráficos exibem {len(idx_df)} de {len(df_historico)} períodos (redução LTTB); as estatísticas usam todos os dados.")
                 
                 # Estatísticas resumidas
                 st.markdown("---")
                 st.subheader("📊 Estatísticas Resumidas")
                 
+                # Médias e extremos em uma única agregação
+                estatisticas = df_historico.agg({
+                    'df': ['mean', 'min'],
+                    'mtbf': ['mean', 'max'],
+                    'mttr': ['mean', 'min'],
+                    'taxa_preventiva': ['mean']
+                })
+                
+                # Soma direta da coluna: mantém o tipo original (falhas fracionárias não são arredondadas)
+                total_falhas = df_historico['num_falhas'].sum()
+                
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
-                    st.metric("DF Médio", f"{df_historico['df'].mean():.2f}%")
-                    st.metric("DF Mínimo", f"{df_historico['df'].min():.2f}%")
+                    st.metric("DF Médio", f"{estatisticas.at['mean', 'df']:.2f}%")
+                    st.metric("DF Mínimo", f"{estatisticas.at['min', 'df']:.2f}%")
                 
                 with col2:
-                    st.metric("MTBF Médio", f"{df_historico['mtbf'].mean():.2f} h")
-                    st.metric("MTBF Máximo", f"{df_historico['mtbf'].max():.2f} h")
+                    st.metric("MTBF Médio", f"{estatisticas.at['mean', 'mtbf']:.2f} h")
+                    st.metric("MTBF Máximo", f"{estatisticas.at['max', 'mtbf']:.2f} h")
                 
                 with col3:
-                    st.metric("MTTR Médio", f"{df_historico['mttr'].mean():.2f} h")
-                    st.metric("MTTR Mínimo", f"{df_historico['mttr'].min():.2f} h")
+                    st.metric("MTTR Médio", f"{estatisticas.at['mean', 'mttr']:.2f} h")
+                    st.metric("MTTR Mínimo", f"{estatisticas.at['min', 'mttr']:.2f} h")
                 
                 with col4:
-                    st.metric("Taxa Prev. Média", f"{df_historico['taxa_preventiva'].mean():.2f}%")
-                    st.metric("Total de Falhas", f"{df_historico['num_falhas'].sum()}")
+                    st.metric("Taxa Prev. Média", f"{estatisticas.at['mean', 'taxa_preventiva']:.2f}%")
+                    st.metric("Total de Falhas", f"{total_falhas}")
                 
         except Exception as e:
             st.error(f"❌ Erro ao processar arquivo: {str(e)}")
@@ -1723,9 +1858,4 @@ elif "Análise Histórica" in modo_calculo:
 
 # Rodapé
 st.markdown("---")
-st.markdown("""
-<div style='text-align: center; color: #7f8c8d;'>
-    <p>📊 Sistema de Monitoramento de Performance Operacional</p>
-    <p>Desenvolvido para análise de KPIs industriais</p>
-</div>
-""", unsafe_allow_html=True)
+st.html(RODAPE_HTML)
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import reduzir_pontos_lttb
+
+
+def test_serie_curta_mantem_todos_os_pontos():
+    datas = pd.Series(pd.date_range("2024-01-01", periods=50, freq="D"))
+    np.testing.assert_array_equal(reduzir_pontos_lttb(datas, np.arange(50), limite=100), np.arange(50))
+
+
+def test_datas_com_fuso_horario_acima_do_limite():
+    datas = pd.Series(pd.date_range("2024-01-01", periods=5000, freq="h", tz="America/Sao_Paulo"))
+    valores = np.sin(np.arange(5000) / 200)
+    valores[3100] = 10
+
+    indices = reduzir_pontos_lttb(datas, valores, limite=500)
+
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == 4999
+    assert np.all(np.diff(indices) > 0)
+    assert 3100 in indices
+
+
+def test_datas_com_e_sem_fuso_horario_dao_o_mesmo_resultado():
+    datas_utc = pd.Series(pd.date_range("2024-01-01", periods=3000, freq="h", tz="UTC"))
+    valores = np.cos(np.arange(3000) / 50)
+
+    np.testing.assert_array_equal(
+        reduzir_pontos_lttb(datas_utc, valores, limite=300),
+        reduzir_pontos_lttb(datas_utc.dt.tz_localize(None), valores, limite=300)
+    )